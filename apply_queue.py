@@ -0,0 +1,150 @@
+# apply_queue.py
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+# SQLite-backed queue for /apply jobs; survives API restarts
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apply_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    logs TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS apply_jobs_status_created ON apply_jobs (status, created_at);
+"""
+
+class ApplyQueue:
+    # Several API processes may share one DB file. A running job belongs to the process that
+    # claimed it until its lease expires; only then can another process take it over, and a
+    # job that has used up max_attempts is failed rather than submitted again.
+    def __init__(self, db_path: str = "apply_queue.db", owner: str = None,
+                 lease_seconds: float = 600.0, max_attempts: int = 1):
+        self.db_path = db_path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # DBs created before leases existed
+        cols = {r["name"] for r in self._conn.execute("PRAGMA table_info(apply_jobs)")}
+        for col, ddl in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if col not in cols:
+                self._conn.execute(f"ALTER TABLE apply_jobs ADD COLUMN {col} {ddl}")
+
+    def enqueue(self, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO apply_jobs (id, status, payload, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(payload), time.time()),
+            )
+        return job_id
+
+    def claim(self) -> Optional[Dict]:
+        # Atomically move the oldest queued job (or one whose owner's lease expired) to running
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Abandoned jobs that are out of attempts may already have been submitted once
+                self._conn.execute(
+                    "UPDATE apply_jobs SET status = 'failed', finished_at = ?, "
+                    "error = 'Abandoned by ' || COALESCE(owner, '?') || ' after ' || attempts || ' attempt(s); not retried' "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT id FROM apply_jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND lease_until < ?) ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE apply_jobs SET status = 'running', owner = ?, lease_until = ?, started_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (self.owner, now + self.lease_seconds, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str) -> bool:
+        # Extend our lease on a running job; False means another process has taken it over
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE apply_jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id, self.owner),
+            )
+            return cur.rowcount == 1
+
+    def append_log(self, job_id: str, line: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE apply_jobs SET logs = json_insert(logs, '$[#]', ?) WHERE id = ?",
+                (line, job_id),
+            )
+
+    # complete/fail only land while we still hold the job; a job a peer already failed as
+    # abandoned (or retook) keeps that outcome. False means the result was not recorded.
+    def complete(self, job_id: str, result: Dict) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE apply_jobs SET status = 'done', result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (json.dumps(result), time.time(), job_id, self.owner),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: str, error: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE apply_jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (error, time.time(), job_id, self.owner),
+            )
+            return cur.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM apply_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "payload": json.loads(row["payload"]),
+            "logs": json.loads(row["logs"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "owner": row["owner"],
+            "lease_until": row["lease_until"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,23 +1,24 @@
 # apply_runner.py
-import asyncio, tempfile, os
+import asyncio
 from typing import Dict
 from playwright.async_api import async_playwright
 from ats_adapters import pick_adapter
+from resume_pdf import resume_file_payload
 from tailoring import generate_application_package
 
-async def apply_to_job(job_url: str, applicant: Dict[str, str], base_resume: Dict, job_meta: Dict[str, str]):
-    package = generate_application_package(applicant, base_resume, job_meta)
-
-    # Write tailored resume to a temporary .txt file for upload
-    # (Switch to PDF later if desired)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as f:
-        f.write(package["resume_text"].encode("utf-8"))
-        resume_path = f.name
+async def apply_to_job(job_url: str, applicant: Dict[str, str], base_resume: Dict, job_meta: Dict[str, str], package: Dict[str, str] = None):
+    # package may be pre-generated (the /apply API)
+    if package is None:
+        package = generate_application_package(applicant, base_resume, job_meta)
 
+    # Render the tailored resume to an in-memory PDF; set_input_files takes the payload directly
     docs = {
-        "resume_path": resume_path,
+        "resume_file": resume_file_payload(package["resume_text"], applicant.get("name", "")),
         "cover_letter_text": package["cover_letter_text"],
     }
+    logs = []
+    if docs["resume_file"]["mimeType"] != "application/pdf":
+        logs.append("Resume has characters the PDF fonts can't encode; uploading it as UTF-8 text")
 
     adapter = pick_adapter(job_url)
     if not adapter:
@@ -26,7 +27,6 @@ async def apply_to_job(job_url: str, applicant: Dict[str, str], base_resume: Dic
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
-        logs = []
         try:
             await page.goto(job_url, wait_until="domcontentloaded", timeout=60000)
             if hasattr(adapter, "login_if_needed"):
@@ -37,10 +37,6 @@ async def apply_to_job(job_url: str, applicant: Dict[str, str], base_resume: Dic
             return {"ok": result.get("ok", False), "logs": logs}
         finally:
             await browser.close()
-            try:
-                os.unlink(resume_path)
-            except Exception:
-                pass
 
 # Example usage:
 # asyncio.run(apply_to_job(job_url, applicant_dict, base_resume_dict, {"company": "Acme", "role": "Backend Engineer", "job_desc": jd_text}))
\ No newline at end of file
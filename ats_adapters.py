@@ -9,7 +9,8 @@ class ATSAdapter:
     async def login_if_needed(self, page: Page) -> None:
         # Implement site-specific login or detect login state
         return
-    async def fill_and_submit(self, page: Page, applicant: Dict[str, str], docs: Dict[str, str]) -> Dict[str, str]:
+    async def fill_and_submit(self, page: Page, applicant: Dict[str, str], docs: Dict) -> Dict[str, str]:
+        # docs["resume_file"] is a file path or a Playwright file payload (name/mimeType/buffer)
         raise NotImplementedError
 
 class GreenhouseAdapter(ATSAdapter):
@@ -32,7 +33,7 @@ class GreenhouseAdapter(ATSAdapter):
 
         # Upload resume
         if await page.locator("input[type='file']").count():
-            await page.set_input_files("input[type='file']", docs["resume_path"])
+            await page.set_input_files("input[type='file']", docs["resume_file"])
             logs.append("Uploaded resume")
 
         # Submit
@@ -59,7 +60,7 @@ class LeverAdapter(ATSAdapter):
             await page.fill("textarea[name='comments']", docs.get("cover_letter_text", ""))
 
         if await page.locator("input[type='file']").count():
-            await page.set_input_files("input[type='file']", docs["resume_path"])
+            await page.set_input_files("input[type='file']", docs["resume_file"])
             logs.append("Uploaded resume")
 
         if await page.locator("button:has-text('Submit')").count():
@@ -82,7 +83,7 @@ class WorkdayAdapter(ATSAdapter):
         # Workday flows differ by tenant; keep robust queries and fallbacks
         # Resume upload first
         if await page.locator("input[type='file']").count():
-            await page.set_input_files("input[type='file']", docs["resume_path"])
+            await page.set_input_files("input[type='file']", docs["resume_file"])
             logs.append("Uploaded resume")
 
         # Basic personal info
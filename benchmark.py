@@ -0,0 +1,349 @@
+# benchmark.py
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+import job_finder
+from ats_adapters import GreenhouseAdapter, LeverAdapter, WorkdayAdapter
+from run_auto_apply import extract_job_desc, read_json
+from resume_pdf import render_resume_pdf
+from tailoring import generate_application_package
+
+# Title/location pools for synthetic postings; a share of them match the default QA filters
+TITLES = [
+    "QA Engineer", "Junior QA Engineer", "Associate Test Engineer", "Entry Level SDET",
+    "QA Automation Engineer I", "Quality Assurance Analyst", "Software Tester",
+    "Senior Software Engineer", "Staff QA Engineer", "Product Manager", "Data Scientist",
+    "Engineering Manager", "Account Executive", "Backend Engineer", "Test Analyst",
+]
+LOCATIONS = [
+    "Remote - US", "Remote (Canada)", "New York, NY", "San Francisco, CA",
+    "London, UK", "Anywhere", "Austin, TX", "Remote - EMEA",
+]
+DESC_LINES = [
+    "We are looking for an engineer to help us ship high quality releases.",
+    "Requirements:",
+    "- 1+ years of experience with test automation using Python and PyTest",
+    "- Hands-on experience with Selenium or Cypress for UI testing",
+    "- Familiarity with API testing using Postman and REST/JSON",
+    "- Working knowledge of SQL (MySQL or PostgreSQL)",
+    "- Experience with CI/CD pipelines such as Jenkins or GitHub Actions",
+    "Nice to have:",
+    "- Exposure to performance testing with JMeter",
+    "- Experience tracking defects in JIRA within Agile/Scrum teams",
+]
+
+GREENHOUSE_FORM = """<html><body><form method="post" action="/submit" enctype="multipart/form-data">
+<input name="first_name"><input name="last_name">
+<input type="email" name="email"><input type="tel" name="phone">
+<textarea name="cover_letter"></textarea>
+<input type="file" name="resume">
+<button type="submit">Submit Application</button>
+</form></body></html>"""
+
+LEVER_FORM = """<html><body><form method="post" action="/submit" enctype="multipart/form-data">
+<input name="name"><input name="email"><input name="phone">
+<textarea name="comments"></textarea>
+<input type="file" name="resume">
+<button type="submit">Submit application</button>
+</form></body></html>"""
+
+# Workday is a single-page app; its buttons don't navigate
+WORKDAY_FORM = """<html><body><div>
+<input type="file">
+<input aria-label="First Name"><input aria-label="Last Name">
+<input aria-label="Email"><input aria-label="Phone">
+<textarea>Cover Letter</textarea>
+<button type="button">Next</button><button type="button">Review</button>
+<button type="button">Submit</button>
+</div></body></html>"""
+
+FORMS = {"greenhouse": GREENHOUSE_FORM, "lever": LEVER_FORM, "workday": WORKDAY_FORM}
+
+
+def build_fixtures(n_postings: int, n_boards: int, base_url: str, seed: int = 1234) -> dict:
+    # Payloads mirror the shape of recorded Lever / Greenhouse board API responses
+    rng = random.Random(seed)
+    n_lever = max(1, n_boards // 2)
+    n_gh = max(1, n_boards - n_lever)
+    lever = {f"lever-co-{i}": [] for i in range(n_lever)}
+    greenhouse = {f"gh-co-{i}": {"jobs": [], "meta": {"total": 0}} for i in range(n_gh)}
+    lever_names = list(lever)
+    gh_names = list(greenhouse)
+    descriptions = {}
+
+    for i in range(n_postings):
+        title = rng.choice(TITLES)
+        loc = rng.choice(LOCATIONS)
+        desc = "\n".join(rng.sample(DESC_LINES, k=len(DESC_LINES) - 2))
+        if i % 2 == 0:
+            company = lever_names[(i // 2) % n_lever]
+            pid = f"{i:08d}-lever"
+            url = f"{base_url}/jobs/lever/{company}/{pid}"
+            lever[company].append({
+                "id": pid,
+                "text": title,
+                "hostedUrl": url,
+                "applyUrl": f"{url}/apply",
+                "createdAt": 1700000000000 + i,
+                "workplaceType": "remote" if "Remote" in loc else "onsite",
+                "categories": {
+                    "commitment": "Full-time",
+                    "department": "Engineering",
+                    "location": loc,
+                    "team": company,
+                },
+                "description": f"<div>{escape(desc)}</div>",
+                "descriptionPlain": desc,
+                "lists": [{"text": "Requirements", "content": "<li>" + "</li><li>".join(DESC_LINES[2:7]) + "</li>"}],
+                "additional": "<div>We are an equal opportunity employer.</div>",
+                "additionalPlain": "We are an equal opportunity employer.",
+            })
+        else:
+            company = gh_names[(i // 2) % n_gh]
+            pid = 4000000 + i
+            url = f"{base_url}/jobs/greenhouse/{company}/{pid}"
+            board = greenhouse[company]
+            board["jobs"].append({
+                "absolute_url": url,
+                "data_compliance": [{"type": "gdpr", "requires_consent": False, "retention_period": None}],
+                "internal_job_id": 3000000 + i,
+                "location": {"name": loc},
+                "metadata": None,
+                "id": pid,
+                "updated_at": "2024-01-01T00:00:00-05:00",
+                "requisition_id": f"REQ-{i}",
+                "title": title,
+            })
+            board["meta"]["total"] += 1
+        descriptions[url] = (title, desc)
+
+    return {"lever": lever, "greenhouse": greenhouse, "descriptions": descriptions}
+
+
+def _greenhouse_board_html(board: dict) -> str:
+    # discover_greenhouse reads the location from the element after the link's parent
+    rows = []
+    for j in board["jobs"]:
+        href = urlparse(j["absolute_url"]).path
+        rows.append(f'<div class="opening"><a href="{href}">{escape(j["title"])}</a></div>'
+                    f'<span class="location">{escape(j["location"]["name"])}</span>')
+    return "<html><body><section id=\"jobs\">" + "".join(rows) + "</section></body></html>"
+
+
+def build_routes(fixtures: dict, greenhouse_api: bool = True) -> dict:
+    # Pre-encode every response once so the server isn't what gets measured
+    routes = {}
+    for company, postings in fixtures["lever"].items():
+        routes[f"/lever-api/v0/postings/{company}"] = ("application/json", json.dumps(postings).encode("utf-8"))
+    for slug, board in fixtures["greenhouse"].items():
+        if greenhouse_api:
+            routes[f"/gh-api/v1/boards/{slug}/jobs"] = ("application/json", json.dumps(board).encode("utf-8"))
+        routes[f"/gh/{slug}"] = ("text/html", _greenhouse_board_html(board).encode("utf-8"))
+    for url, (title, desc) in fixtures["descriptions"].items():
+        body = f"<html><body><h1>{escape(title)}</h1><pre>{escape(desc)}</pre></body></html>"
+        routes[urlparse(url).path] = ("text/html", body.encode("utf-8"))
+    for name, html in FORMS.items():
+        routes[f"/forms/{name}"] = ("text/html", html.encode("utf-8"))
+    return routes
+
+
+def start_server(routes: dict) -> tuple[ThreadingHTTPServer, str]:
+    # routes is read on every request, so it can be filled in after the port is known
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, ctype: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            route = routes.get(urlparse(self.path).path)
+            if route is None:
+                self._send(404, "text/plain", b"not found")
+                return
+            self._send(200, *route)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            self._send(200, "text/html", b"<html><body>Thanks for applying</body></html>")
+
+        def log_message(self, format, *args):
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+def _summarize(samples: list[float]) -> dict:
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "n": len(samples),
+        "total_s": round(sum(samples), 4),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+    }
+
+
+async def bench_find_jobs(sources_path: str, max_total: int, repeat: int, trace_memory: bool = False) -> tuple[dict, list]:
+    samples = []
+    jobs = []
+    peak = 0
+    for _ in range(repeat):
+        if trace_memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        jobs = await job_finder.find_jobs(sources_path, max_total=max_total)
+        samples.append(time.perf_counter() - t0)
+        if trace_memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    out = {**_summarize(samples), "jobs_found": len(jobs)}
+    if trace_memory:
+        # tracemalloc slows everything down; timings from a traced run aren't comparable
+        out["peak_mem_mb"] = round(peak / (1024 * 1024), 2)
+    return out, jobs
+
+
+async def bench_extract_job_desc(urls: list[str]) -> dict:
+    samples = []
+    for url in urls:
+        t0 = time.perf_counter()
+        await extract_job_desc(url)
+        samples.append(time.perf_counter() - t0)
+    return _summarize(samples)
+
+
+def bench_generate_package(applicant: dict, base_resume: dict, descriptions: list[tuple[str, str]]) -> tuple[dict, dict]:
+    samples = []
+    pdf_samples = []
+    for title, desc in descriptions:
+        t0 = time.perf_counter()
+        package = generate_application_package(applicant, base_resume, {"company": "Acme", "role": title, "job_desc": desc})
+        t1 = time.perf_counter()
+        render_resume_pdf(package["resume_text"])
+        samples.append(t1 - t0)
+        pdf_samples.append(time.perf_counter() - t1)
+    return _summarize(samples), _summarize(pdf_samples)
+
+
+async def bench_adapters(base_url: str, applicant: dict, docs: dict, iterations: int) -> dict:
+    # Adapters are driven directly: their URL matchers expect the real ATS hosts
+    adapters = {"greenhouse": GreenhouseAdapter(), "lever": LeverAdapter(), "workday": WorkdayAdapter()}
+    out = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            for name, adapter in adapters.items():
+                samples = []
+                for _ in range(iterations):
+                    page = await browser.new_page()
+                    await page.goto(f"{base_url}/forms/{name}", wait_until="domcontentloaded")
+                    t0 = time.perf_counter()
+                    await adapter.fill_and_submit(page, applicant, docs)
+                    samples.append(time.perf_counter() - t0)
+                    await page.close()
+                out[name] = _summarize(samples)
+        finally:
+            await browser.close()
+    return out
+
+
+async def run_scale(args, scale: int, applicant: dict, base_resume: dict, filters: dict) -> dict:
+    routes = {}
+    server, base_url = start_server(routes)
+    fixtures = build_fixtures(scale, args.boards, base_url, seed=args.seed)
+    routes.update(build_routes(fixtures, greenhouse_api=not args.greenhouse_html))
+
+    job_finder.LEVER_API_BASE = f"{base_url}/lever-api"
+    job_finder.GREENHOUSE_API_BASE = f"{base_url}/gh-api"
+
+    sources = {
+        "lever_companies": list(fixtures["lever"]),
+        "greenhouse_boards": [f"{base_url}/gh/{slug}" for slug in fixtures["greenhouse"]],
+        "filters": filters,
+    }
+    fd, sources_path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(sources, f)
+
+    result = {"scale": scale, "boards": args.boards}
+    try:
+        result["find_jobs"], jobs = await bench_find_jobs(sources_path, scale, args.repeat, args.trace_memory)
+        urls = [j.url for j in jobs[:args.desc_sample]]
+        result["extract_job_desc"] = await bench_extract_job_desc(urls)
+        descs = list(fixtures["descriptions"].values())[:args.tailor_limit or None]
+        result["generate_application_package"], result["render_resume_pdf"] = bench_generate_package(applicant, base_resume, descs)
+        if args.apply_iterations > 0:
+            resume = {"name": "Resume.pdf", "mimeType": "application/pdf", "buffer": render_resume_pdf("Benchmark\n\nSummary\n- resume")}
+            docs = {"resume_file": resume, "cover_letter_text": "Benchmark cover letter"}
+            result["fill_and_submit"] = await bench_adapters(base_url, applicant, docs, args.apply_iterations)
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.unlink(sources_path)
+    return result
+
+
+def _print_result(result: dict):
+    print(f"\n== scale={result['scale']} boards={result['boards']} ==")
+    for key in ("find_jobs", "extract_job_desc", "generate_application_package", "render_resume_pdf"):
+        print(f"{key:>30}: {result.get(key)}")
+    for name, summary in (result.get("fill_and_submit") or {}).items():
+        print(f"{'fill_and_submit[' + name + ']':>30}: {summary}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark discovery and apply against local ATS stand-ins.")
+    parser.add_argument("--applicant", default="application.json")
+    parser.add_argument("--resume", default="base_resume.json")
+    parser.add_argument("--sources", default="sources.json", help="Filters are taken from this file")
+    parser.add_argument("--scales", default="10,100,1000,10000", help="Comma-separated posting counts")
+    parser.add_argument("--boards", type=int, default=20, help="Number of boards the postings are spread over")
+    parser.add_argument("--repeat", type=int, default=1, help="find_jobs runs per scale")
+    parser.add_argument("--desc-sample", type=int, default=5, help="Postings to time extract_job_desc on")
+    parser.add_argument("--tailor-limit", type=int, default=0, help="Cap generate_application_package calls (0 = all)")
+    parser.add_argument("--apply-iterations", type=int, default=3, help="fill_and_submit runs per adapter (0 = skip)")
+    parser.add_argument("--greenhouse-html", action="store_true", help="Disable the Greenhouse API to time HTML discovery")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python heap during find_jobs")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", dest="json_out", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    applicant = read_json(args.applicant)
+    base_resume = read_json(args.resume)
+    filters = read_json(args.sources).get("filters", {})
+
+    results = []
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        result = await run_scale(args, scale, applicant, base_resume, filters)
+        _print_result(result)
+        results.append(result)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
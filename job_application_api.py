@@ -1,11 +1,34 @@
 # fastapi_app.py
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from typing import Awaitable, Callable, Dict, List, Optional
+from functools import lru_cache, partial
 import asyncio
+import heapq
+import json
+import os
+
+from apply_queue import ApplyQueue
+from tailoring import KeywordModel, build_keyword_model, generate_application_package
 
 app = FastAPI()
 
+# Queue/worker settings (env-configurable)
+APPLY_QUEUE_DB = os.environ.get("APPLY_QUEUE_DB", "apply_queue.db")
+APPLY_WORKERS = int(os.environ.get("APPLY_WORKERS", "2"))
+APPLY_POLL_SECONDS = float(os.environ.get("APPLY_POLL_SECONDS", "2.0"))
+APPLY_LEASE_SECONDS = float(os.environ.get("APPLY_LEASE_SECONDS", "600"))
+APPLY_MAX_ATTEMPTS = int(os.environ.get("APPLY_MAX_ATTEMPTS", "1"))  # >1 allows re-submitting an application abandoned mid-run
+APPLICANT_PATH = os.environ.get("APPLICANT_PATH", "application.json")
+BASE_RESUME_PATH = os.environ.get("BASE_RESUME_PATH", "base_resume.json")
+# Batch scoring responses larger than this are streamed as NDJSON
+SCORE_STREAM_THRESHOLD = int(os.environ.get("SCORE_STREAM_THRESHOLD", "1000"))
+
+queue: Optional[ApplyQueue] = None
+_wakeup: Optional[asyncio.Event] = None
+_workers: list = []
+
 class Job(BaseModel):
     title: str
     company: str
@@ -13,11 +36,28 @@ class Job(BaseModel):
     description: str
     location: Optional[str] = None
 
+class BatchJob(BaseModel):
+    # Discovered postings often have no description yet
+    title: str
+    company: str = ""
+    url: str = ""
+    description: str = ""
+    location: Optional[str] = None
+
+class BatchScoreRequest(BaseModel):
+    jobs: List[BatchJob]
+    top_k: Optional[int] = None
+    stream: Optional[bool] = None
+
 class ApplyRequest(BaseModel):
     job_url: HttpUrl
+    # Uploaded as-is (rendered to PDF); cover_prompt, when set, is used as the cover letter text
     resume_text: str
     cover_prompt: Optional[str] = None
     dry_run: bool = True
+    company: Optional[str] = None
+    role: Optional[str] = None
+    job_desc: Optional[str] = None
 
 @app.post("/jobs/score")
 def score_job(job: Job):
@@ -27,18 +67,166 @@ def score_job(job: Job):
     score = sum(1 for k in desired if k in text) / max(1, len(desired))
     return {"score": score}
 
-@app.post("/apply")
+@lru_cache(maxsize=1)
+def _scoring_model() -> KeywordModel:
+    # Built once from the resume skills and reused by every batch request
+    return build_keyword_model(_read_json(BASE_RESUME_PATH))
+
+@app.post("/jobs/score:batch")
+def score_jobs_batch(req: BatchScoreRequest):
+    model = _scoring_model()
+    scored = (
+        (model.score(f"{j.title} {j.company} {j.description}"), -i, i)
+        for i, j in enumerate(req.jobs)
+    )
+    # Ties keep input order; top_k keeps only a bounded heap
+    if req.top_k is not None:
+        ranked = heapq.nlargest(max(0, req.top_k), scored)
+    else:
+        ranked = sorted(scored, reverse=True)
+
+    def _row(rank: int, score: float, i: int) -> Dict:
+        j = req.jobs[i]
+        return {"rank": rank, "index": i, "title": j.title, "company": j.company, "url": j.url, "score": score}
+
+    stream = req.stream if req.stream is not None else len(ranked) > SCORE_STREAM_THRESHOLD
+    if stream:
+        def _ndjson():
+            for rank, (score, _, i) in enumerate(ranked, start=1):
+                yield json.dumps(_row(rank, score, i)) + "\n"
+        return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+    return {"results": [_row(rank, score, i) for rank, (score, _, i) in enumerate(ranked, start=1)]}
+
+@app.post("/apply", status_code=202)
 async def apply_job(req: ApplyRequest):
-    # Kick off an async automation task
-    try:
-        result = await run_application(job_url=req.job_url, resume_text=req.resume_text, cover_prompt=req.cover_prompt, dry_run=req.dry_run)
-        return {"status": "ok", "result": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-async def run_application(job_url: str, resume_text: str, cover_prompt: Optional[str], dry_run: bool):
-    # Stub: call your Playwright routine; return logs instead when dry_run=True
+    # Enqueue only; a worker picks it up and the client polls GET /apply/{id}.
+    # Queue calls can wait on another process's SQLite lock, so they run off the event loop.
+    job_id = await asyncio.to_thread(queue.enqueue, {
+        "job_url": str(req.job_url),
+        "resume_text": req.resume_text,
+        "cover_prompt": req.cover_prompt,
+        "dry_run": req.dry_run,
+        "company": req.company,
+        "role": req.role,
+        "job_desc": req.job_desc,
+    })
+    _wakeup.set()
+    return {"status": "queued", "job_id": job_id}
+
+@app.get("/apply/{job_id}")
+def apply_status(job_id: str):
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "logs": job["logs"],
+        "result": job["result"],
+        "error": job["error"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+@app.on_event("startup")
+async def start_workers():
+    global queue, _wakeup
+    # Jobs interrupted in another (or a previous) process are retaken by claim() once their lease expires
+    queue = ApplyQueue(APPLY_QUEUE_DB, lease_seconds=APPLY_LEASE_SECONDS, max_attempts=APPLY_MAX_ATTEMPTS)
+    _wakeup = asyncio.Event()
+    for i in range(max(1, APPLY_WORKERS)):
+        _workers.append(asyncio.create_task(_worker(i)))
+
+@app.on_event("shutdown")
+async def stop_workers():
+    for t in _workers:
+        t.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    queue.close()
+
+async def _worker(worker_id: int):
+    while True:
+        job = await asyncio.to_thread(queue.claim)
+        if job is None:
+            # Sleep until something is enqueued (or poll, for jobs added by another process)
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=APPLY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        job_id = job["id"]
+        log = partial(_append_log, job_id)
+        await log(f"Picked up by worker {worker_id} ({queue.owner}), attempt {job['attempts']}")
+        application = asyncio.create_task(run_application(log=log, **job["payload"]))
+        heartbeat = asyncio.create_task(_keep_lease(job_id, application))
+        try:
+            result = await application
+            if not await asyncio.to_thread(queue.complete, job_id, result):
+                await log("Finished after the lease was lost; result not recorded")
+        except asyncio.CancelledError:
+            if not (heartbeat.done() and not heartbeat.cancelled()):
+                # Shutdown: left as running; another process may retake it after the lease expires
+                # (attempts permitting)
+                raise
+            await log("Lease lost to another process; application cancelled")
+        except Exception as e:
+            await log(f"Error: {e}")
+            await asyncio.to_thread(queue.fail, job_id, str(e))
+        finally:
+            heartbeat.cancel()
+
+async def _keep_lease(job_id: str, application: asyncio.Task):
+    # Once another process owns the job, stop driving the browser rather than submit it twice
+    while True:
+        await asyncio.sleep(APPLY_LEASE_SECONDS / 3)
+        if not await asyncio.to_thread(queue.heartbeat, job_id):
+            application.cancel()
+            return
+
+async def _append_log(job_id: str, line: str):
+    await asyncio.to_thread(queue.append_log, job_id, line)
+
+async def _print_log(line: str):
+    print(line)
+
+def _read_json(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+async def run_application(job_url: str, resume_text: str, cover_prompt: Optional[str], dry_run: bool,
+                          company: Optional[str] = None, role: Optional[str] = None,
+                          job_desc: Optional[str] = None, log: Callable[[str], Awaitable[None]] = _print_log):
     if dry_run:
+        await log("Dry run; skipping browser automation")
         return {"message": "Dry run; would open job page and fill forms.", "url": job_url}
-    # In production: call automation.play_apply(...)
-    return {"message": "Submitted (simulated).", "url": job_url}
\ No newline at end of file
+
+    # Imported lazily so the API can serve dry runs without a browser install
+    from apply_runner import apply_to_job
+
+    applicant = _read_json(APPLICANT_PATH)
+    base_resume = _read_json(BASE_RESUME_PATH)
+    job_meta = {"company": company or "the company", "role": role or "the role", "job_desc": job_desc or ""}
+    # The caller's resume (and cover letter, if given) win over the generated ones
+    package = generate_application_package(applicant, base_resume, job_meta)
+    package["resume_text"] = resume_text
+    if cover_prompt:
+        package["cover_letter_text"] = cover_prompt
+
+    await log(f"Applying to {job_url}")
+    result = await apply_to_job(
+        job_url=job_url,
+        applicant=applicant,
+        base_resume=base_resume,
+        job_meta=job_meta,
+        package=package,
+    )
+    for line in result.get("logs", []):
+        await log(line)
+    if not result.get("ok"):
+        raise RuntimeError(result.get("error") or "Application did not complete")
+    return {"message": "Submitted.", "url": job_url}
@@ -1,16 +1,26 @@
 # job_finder.py
 import asyncio
+import heapq
 import json
 import re
+import sys
+from dataclasses import dataclass
 from urllib.parse import urljoin
 
-from playwright.async_api import async_playwright
+from tailoring import build_keyword_model, build_title_model
 
 # Default patterns (will be overridden dynamically from sources.json if provided)
 ROLE_PAT = re.compile(r"\b(qa|quality|test|sdet|software\s+engineer)\b", re.I)
 REMOTE_PAT = re.compile(r"\b(remote|work\s*from\s*home|anywhere)\b", re.I)
 EXCLUDE_PAT = re.compile(r"\b(senior\s+director|vp|principal)\b", re.I)
 ENTRY_PAT = re.compile(r"", re.I)  # empty means "no extra constraint"
+# Role phrases behind ROLE_PAT; also the vocabulary rank_jobs scores titles with
+DEFAULT_ROLE_WORDS = ["qa", "quality", "test", "sdet", "software engineer"]
+ROLE_WORDS = list(DEFAULT_ROLE_WORDS)
+
+# ATS API hosts (overridable, e.g. benchmark.py points these at a local server)
+LEVER_API_BASE = "https://api.lever.co"
+GREENHOUSE_API_BASE = "https://boards-api.greenhouse.io"
 
 def _compile_pattern(words: list[str], default_regex: str) -> re.Pattern:
     if not words:
@@ -30,7 +40,7 @@ def _compile_pattern(words: list[str], default_regex: str) -> re.Pattern:
         return re.compile(alt, re.I)
 
 def _apply_filters_from_cfg(cfg: dict) -> dict:
-    global ROLE_PAT, REMOTE_PAT, EXCLUDE_PAT, ENTRY_PAT
+    global ROLE_PAT, REMOTE_PAT, EXCLUDE_PAT, ENTRY_PAT, ROLE_WORDS
     filters = cfg.get("filters", {}) or {}
     include_words = filters.get("include_keywords") or []
     remote_words = filters.get("remote_keywords") or []
@@ -38,6 +48,7 @@ def _apply_filters_from_cfg(cfg: dict) -> dict:
     entry_words = filters.get("entry_keywords") or []
 
     ROLE_PAT = _compile_pattern(include_words, r"\b(qa|quality|test|sdet|software\s+engineer)\b")
+    ROLE_WORDS = [w.strip() for w in include_words if w.strip()] or list(DEFAULT_ROLE_WORDS)
     REMOTE_PAT = _compile_pattern(remote_words, r"\b(remote|work\s*from\s*home|anywhere)\b")
     EXCLUDE_PAT = _compile_pattern(exclude_words, r"\b(senior\s+director|vp|principal)\b")
     # If entry_words provided, enforce at least one match; otherwise no constraint
@@ -49,15 +60,101 @@ def _apply_filters_from_cfg(cfg: dict) -> dict:
         "exclude_words": exclude_words,
     }
 
-async def _fetch_json(page, url: str):
+@dataclass(slots=True)
+class Posting:
+    # Slotted record for discovered jobs; company/location/source repeat across thousands
+    # of postings, so they are interned by make_posting
+    title: str
+    company: str
+    url: str
+    location: str
+    source: str
+    description: str = ""
+    score: float = 0.0
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Posting":
+        p = make_posting(d.get("title", ""), d.get("company", ""), d.get("url", ""), d.get("location", ""), d.get("source", ""))
+        p.description = d.get("description", "")
+        p.score = d.get("score", 0.0)
+        return p
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "company": self.company,
+            "url": self.url,
+            "location": self.location,
+            "source": self.source,
+            "description": self.description,
+            "score": self.score,
+        }
+
+def make_posting(title: str, company: str, url: str, location: str, source: str) -> Posting:
+    return Posting(title, sys.intern(company), url, sys.intern(location), sys.intern(source))
+
+async def _fetch_text(page, url: str):
+    # Playwright's APIResponse only hands over the whole body, so it is buffered once as text;
+    # the parsing below avoids building a second, full Python copy of it
     resp = await page.request.get(url, timeout=45000)
     if not resp.ok:
         return None
     try:
-        return await resp.json()
+        return await resp.text()
     except Exception:
         return None
 
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+def _expect(text: str, idx: int, chars: str) -> int:
+    # Skip whitespace and require one of chars next; truncated or malformed input raises ValueError
+    idx = _WS.match(text, idx).end()
+    if idx >= len(text) or text[idx] not in chars:
+        raise ValueError(f"Expected {chars!r} at offset {idx}")
+    return idx
+
+def _iter_json_array(text: str, key: str = None):
+    # Yield the elements of a top-level JSON array (or of the array under `key` in a
+    # top-level object) one at a time from the buffered body. Only the current element is
+    # built as Python objects; callers filter it and keep just the postings they want.
+    # A top-level value of another type (e.g. Lever's {"ok": false}) yields nothing.
+    if not text:
+        return
+    idx = _WS.match(text, 0).end()
+    if key is not None:
+        if text[idx:idx + 1] != "{":
+            return
+        idx += 1
+        while True:
+            idx = _expect(text, idx, '"}')
+            if text[idx] == "}":
+                return
+            name, idx = _DECODER.raw_decode(text, idx)
+            idx = _expect(text, idx, ":") + 1
+            idx = _WS.match(text, idx).end()
+            if name == key:
+                break
+            _, idx = _DECODER.raw_decode(text, idx)
+            idx = _expect(text, idx, ",}")
+            if text[idx] == ",":
+                idx += 1
+    if text[idx:idx + 1] != "[":
+        if key is not None:
+            raise ValueError(f"Expected an array under {key!r}")
+        return
+    idx = _WS.match(text, idx + 1).end()
+    if text[idx:idx + 1] == "]":
+        return
+    while True:
+        # raw_decode raises JSONDecodeError (a ValueError) on truncated elements
+        item, idx = _DECODER.raw_decode(text, idx)
+        yield item
+        idx = _expect(text, idx, ",]")
+        if text[idx] == "]":
+            return
+        idx = _WS.match(text, idx + 1).end()
+
 def _match_role(title: str) -> bool:
     return bool(ROLE_PAT.search(title or ""))
 
@@ -73,42 +170,56 @@ def _match_entry(title: str) -> bool:
         return True
     return bool(ENTRY_PAT.search(title or ""))
 
-async def discover_lever(page, companies: list[str]) -> tuple[list[dict], dict]:
+def _iter_lever_postings(body: str, company: str):
+    # Keep only the four fields discovery needs from each (large) Lever posting object
+    for j in _iter_json_array(body):
+        if not isinstance(j, dict):
+            continue
+        categories = j.get("categories")
+        if not isinstance(categories, dict):
+            categories = {}
+        yield (
+            j.get("text") or "",
+            categories.get("location", "") or "",
+            j.get("hostedUrl") or j.get("applyUrl") or "",
+            categories.get("team") or company,
+        )
+
+async def discover_lever(page, companies: list[str]) -> tuple[list[Posting], dict]:
     jobs = []
     stats = {"lever_raw": 0, "lever_kept": 0}
     for company in companies:
-        url = f"https://api.lever.co/v0/postings/{company}?mode=json"
-        data = await _fetch_json(page, url)
-        if not data:
+        url = f"{LEVER_API_BASE}/v0/postings/{company}?mode=json"
+        body = await _fetch_text(page, url)
+        if not body:
             continue
-        stats["lever_raw"] += len(data)
-        for j in data:
-            title = j.get("text", "")
-            loc = (j.get("categories", {}) or {}).get("location", "") or ""
-            url = j.get("hostedUrl") or j.get("applyUrl") or ""
-            company_name = j.get("categories", {}).get("team") or company
-            text_to_check = f"{title} {loc}"
-            if not _match_role(title):
-                continue
-            if not _match_remote(text_to_check):
-                continue
-            if _excluded(title):
-                continue
-            if not _match_entry(title):
-                continue
-            jobs.append({
-                "title": title,
-                "company": company_name,
-                "url": url,
-                "location": loc,
-                "source": "lever",
-            })
-            stats["lever_kept"] += 1
+        # Filter while walking the body so only kept postings are ever materialized;
+        # they are added once the whole board parsed, so a malformed body skips the board
+        raw = 0
+        kept = []
+        try:
+            for title, loc, url, company_name in _iter_lever_postings(body, company):
+                raw += 1
+                text_to_check = f"{title} {loc}"
+                if not _match_role(title):
+                    continue
+                if not _match_remote(text_to_check):
+                    continue
+                if _excluded(title):
+                    continue
+                if not _match_entry(title):
+                    continue
+                kept.append(make_posting(title, company_name, url, loc, "lever"))
+        except ValueError:
+            continue
+        stats["lever_raw"] += raw
+        stats["lever_kept"] += len(kept)
+        jobs.extend(kept)
     return jobs, stats
 
 # ... existing code ...
 
-async def discover_greenhouse(page, boards: list[str]) -> tuple[list[dict], dict]:
+async def discover_greenhouse(page, boards: list[str]) -> tuple[list[Posting], dict]:
     jobs = []
     stats = {"gh_raw_links": 0, "gh_kept": 0}
     for board in boards:
@@ -131,7 +242,10 @@ async def discover_greenhouse(page, boards: list[str]) -> tuple[list[dict], dict
             url = urljoin(board, href) if href else ""
             # Location heuristics: look for nearby node or data-attribute
             loc_node = a.locator("xpath=../following-sibling::*[1]")
-            loc = (await loc_node.text_content() or "").strip()
+            # text_content() waits for a missing node until timeout, so check it exists first
+            loc = ""
+            if await loc_node.count():
+                loc = (await loc_node.first.text_content() or "").strip()
             if not loc:
                 loc_attr = await a.get_attribute("data-location")
                 loc = (loc_attr or "").strip()
@@ -145,18 +259,26 @@ async def discover_greenhouse(page, boards: list[str]) -> tuple[list[dict], dict
             if not _match_entry(title):
                 continue
             company_name = board.rstrip("/").split("/")[-1]
-            jobs.append({
-                "title": title,
-                "company": company_name,
-                "url": url,
-                "location": loc,
-                "source": "greenhouse",
-            })
+            jobs.append(make_posting(title, company_name, url, loc, "greenhouse"))
             stats["gh_kept"] += 1
     return jobs, stats
 
 # NEW: Greenhouse API-based discovery for reliability
-async def discover_greenhouse_api(page, boards: list[str]) -> tuple[list[dict], dict]:
+def _iter_greenhouse_jobs(body: str):
+    # Walk the "jobs" array of a board response, keeping title/location/url only
+    for j in _iter_json_array(body, key="jobs"):
+        if not isinstance(j, dict):
+            continue
+        loc_obj = j.get("location")
+        if not isinstance(loc_obj, dict):
+            loc_obj = {}
+        yield (
+            (j.get("title") or "").strip(),
+            (loc_obj.get("name") or "").strip(),
+            j.get("absolute_url") or "",
+        )
+
+async def discover_greenhouse_api(page, boards: list[str]) -> tuple[list[Posting], dict]:
     jobs = []
     stats = {"gh_api_raw": 0, "gh_api_kept": 0}
 
@@ -174,49 +296,71 @@ async def discover_greenhouse_api(page, boards: list[str]) -> tuple[list[dict],
         slug = _slug_from_board(board)
         if not slug:
             continue
-        api_url = f"https://boards-api.greenhouse.io/v1/boards/{slug}/jobs"
-        data = await _fetch_json(page, api_url)
-        if not data:
+        api_url = f"{GREENHOUSE_API_BASE}/v1/boards/{slug}/jobs"
+        body = await _fetch_text(page, api_url)
+        if not body:
             continue
-        items = data.get("jobs", []) or []
-        stats["gh_api_raw"] += len(items)
-        for j in items:
-            title = (j.get("title") or "").strip()
-            loc_obj = j.get("location") or {}
-            loc = (loc_obj.get("name") or "").strip()
-            url = j.get("absolute_url") or ""
-            text_to_check = f"{title} {loc}"
-            if not _match_role(title):
-                continue
-            if not _match_remote(text_to_check):
-                continue
-            if _excluded(title):
-                continue
-            if not _match_entry(title):
-                continue
-            company_name = slug
-            jobs.append({
-                "title": title,
-                "company": company_name,
-                "url": url,
-                "location": loc,
-                "source": "greenhouse_api",
-            })
-            stats["gh_api_kept"] += 1
+        # As in discover_lever: filter while walking, commit the board once it parsed
+        raw = 0
+        kept = []
+        try:
+            for title, loc, url in _iter_greenhouse_jobs(body):
+                raw += 1
+                text_to_check = f"{title} {loc}"
+                if not _match_role(title):
+                    continue
+                if not _match_remote(text_to_check):
+                    continue
+                if _excluded(title):
+                    continue
+                if not _match_entry(title):
+                    continue
+                company_name = slug
+                kept.append(make_posting(title, company_name, url, loc, "greenhouse_api"))
+        except ValueError:
+            continue
+        stats["gh_api_raw"] += raw
+        stats["gh_api_kept"] += len(kept)
+        jobs.extend(kept)
     return jobs, stats
 
-def dedupe(jobs: list[dict]) -> list[dict]:
+def dedupe(jobs: list[Posting]) -> list[Posting]:
     seen = set()
     out = []
     for j in jobs:
-        u = j.get("url")
+        u = j.url
         if not u or u in seen:
             continue
         seen.add(u)
         out.append(j)
     return out
 
-async def _run_discovery(page, lever_companies, gh_boards) -> tuple[list[dict], dict]:
+def rank_jobs(jobs, base_resume: dict, top_k: int, role_words: list[str] = None) -> list[Posting]:
+    # Title score always; description score once it has been fetched into job.description.
+    # Only the best top_k postings are ever held, so jobs can be any iterable.
+    # role_words defaults to the include_keywords of the last loaded sources.json.
+    if top_k <= 0:
+        return []
+    model = build_keyword_model(base_resume)
+    title_model = build_title_model(base_resume, role_words or ROLE_WORDS)
+    heap = []
+    for i, j in enumerate(jobs):
+        score = title_model.score(j.title)
+        if j.description:
+            score += model.score(j.description)
+        # -i keeps source order among ties and means postings are never compared
+        item = (score, -i, j)
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    out = []
+    for score, _, j in sorted(heap, reverse=True):
+        j.score = round(score, 4)
+        out.append(j)
+    return out
+
+async def _run_discovery(page, lever_companies, gh_boards) -> tuple[list[Posting], dict]:
     lever_jobs, lever_stats = await discover_lever(page, lever_companies)
     # Prefer Greenhouse API; keep HTML fallback in case API is blocked
     gh_api_jobs, gh_api_stats = await discover_greenhouse_api(page, gh_boards)
@@ -231,37 +375,54 @@ async def _run_discovery(page, lever_companies, gh_boards) -> tuple[list[dict],
     }
     return all_jobs, stats
 
-async def find_jobs(sources_path: str = "sources.json", max_total: int = 10) -> list[dict]:
-    # Load config and apply dynamic filters
-    with open(sources_path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
-    filter_info = _apply_filters_from_cfg(cfg)
+async def discover_jobs(cfg: dict, relax_remote: bool = False) -> tuple[list[Posting], dict]:
+    # One discovery pass over the boards in cfg with its own browser.
+    # Sharded workers (sharding.py) call this directly with a slice of sources.json.
+    _apply_filters_from_cfg(cfg)
+    if relax_remote:
+        global REMOTE_PAT
+        REMOTE_PAT = re.compile(r".*", re.I)
 
-    lever_companies = cfg.get("lever_companies", [])
-    gh_boards = cfg.get("greenhouse_boards", [])
+    # Imported lazily so the parsing/ranking helpers (and their tests) don't need a browser install
+    from playwright.async_api import async_playwright
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+        try:
+            page = await browser.new_page()
+            return await _run_discovery(page, cfg.get("lever_companies", []), cfg.get("greenhouse_boards", []))
+        finally:
+            await browser.close()
 
-        jobs, stats = await _run_discovery(page, lever_companies, gh_boards)
+def print_discovery_stats(stats: dict) -> None:
+    print(f"Lever: raw={stats.get('lever_raw',0)} kept={stats.get('lever_kept',0)} | "
+          f"Greenhouse API: raw={stats.get('gh_api_raw',0)} kept={stats.get('gh_api_kept',0)} | "
+          f"Greenhouse HTML: raw_links={stats.get('gh_raw_links',0)} kept={stats.get('gh_kept',0)} | "
+          f"Total (deduped)={stats.get('total_after_dedupe',0)}")
+
+def select_jobs(jobs: list[Posting], max_total: int, base_resume: dict = None) -> list[Posting]:
+    # With a resume, keep the best-matching postings rather than the first ones found
+    if base_resume:
+        return rank_jobs(jobs, base_resume, max_total)
+    return jobs[:max_total]
+
+async def find_jobs(sources_path: str = "sources.json", max_total: int = 10, base_resume: dict = None) -> list[Posting]:
+    # Load config and apply dynamic filters
+    with open(sources_path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    filter_info = _apply_filters_from_cfg(cfg)
 
-        # If nothing found, automatically retry without remote filter (common cause)
-        if len(jobs) == 0 and filter_info.get("has_remote_filter"):
-            print("No jobs matched with remote filter; retrying without remote constraint to diagnose…")
-            global REMOTE_PAT
-            REMOTE_PAT = re.compile(r".*", re.I)
-            jobs, stats = await _run_discovery(page, lever_companies, gh_boards)
-            if stats.get("total_after_dedupe", 0) > 0:
-                print(f"Found {stats['total_after_dedupe']} jobs without remote filter. "
-                      f"Consider broadening filters.remote_keywords in sources.json (currently: {filter_info.get('remote_words')}).")
+    jobs, stats = await discover_jobs(cfg)
 
-        # Diagnostics
-        print(f"Lever: raw={stats.get('lever_raw',0)} kept={stats.get('lever_kept',0)} | "
-              f"Greenhouse API: raw={stats.get('gh_api_raw',0)} kept={stats.get('gh_api_kept',0)} | "
-              f"Greenhouse HTML: raw_links={stats.get('gh_raw_links',0)} kept={stats.get('gh_kept',0)} | "
-              f"Total (deduped)={stats.get('total_after_dedupe',0)}")
+    # If nothing found, automatically retry without remote filter (common cause)
+    if len(jobs) == 0 and filter_info.get("has_remote_filter"):
+        print("No jobs matched with remote filter; retrying without remote constraint to diagnose…")
+        jobs, stats = await discover_jobs(cfg, relax_remote=True)
+        if stats.get("total_after_dedupe", 0) > 0:
+            print(f"Found {stats['total_after_dedupe']} jobs without remote filter. "
+                  f"Consider broadening filters.remote_keywords in sources.json (currently: {filter_info.get('remote_words')}).")
 
-        await browser.close()
+    # Diagnostics
+    print_discovery_stats(stats)
 
-    return jobs[:max_total]
\ No newline at end of file
+    return select_jobs(jobs, max_total, base_resume)
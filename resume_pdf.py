@@ -0,0 +1,290 @@
+# resume_pdf.py
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from tailoring import SECTION_HEADERS
+
+# Advance widths (1/1000 em) for WinAnsi codes 32..126 of the standard Type 1 fonts.
+# Standard fonts need no embedding, so "font loading" is just these tables.
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+# A few WinAnsi codes above 126 that show up in resumes: bullet, en dash, em dash
+_HIGH_WIDTHS = {0x95: 350, 0x96: 556, 0x97: 1000}
+
+FONTS = {
+    "regular": ("F1", "Helvetica", _HELVETICA),
+    "bold": ("F2", "Helvetica-Bold", _HELVETICA_BOLD),
+}
+
+DEFAULT_TEMPLATE = {
+    "page_size": (612, 792),  # US Letter, points
+    "margin": 54,
+    "name": {"font": "bold", "size": 18, "leading": 22},
+    "contact": {"font": "regular", "size": 9.5, "leading": 14},
+    "header": {"font": "bold", "size": 11.5, "leading": 15, "space_before": 10},
+    "body": {"font": "regular", "size": 10, "leading": 13},
+    "bullet_indent": 12,
+}
+
+# Sections that don't change between applications; their layout is cached by text
+STATIC_SECTIONS = {SECTION_HEADERS["education"]}
+# The API renders caller-supplied resumes, so the cache keeps only the most recent distinct blocks
+STATIC_CACHE_SIZE = 32
+
+# A laid-out line: (leading, font resource name, size, x offset, escaped text)
+Line = Tuple[float, bytes, float, float, bytes]
+
+
+def _width_table(base: List[int]) -> List[int]:
+    table = [0] * 32 + base + [556] * (256 - 32 - len(base))
+    for code, w in _HIGH_WIDTHS.items():
+        table[code] = w
+    return table
+
+
+def _encode(text: str) -> bytes:
+    # Strict: a "?" in place of an applicant's name is worse than no PDF (see resume_file_payload)
+    return text.encode("cp1252")
+
+
+def pdf_encodable(text: str) -> bool:
+    # The standard fonts only cover WinAnsi (cp1252); no ł, ş or CJK
+    try:
+        text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _escape(raw: bytes) -> bytes:
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class ResumeTemplate:
+    # Compiled once: style lookups, width tables and font objects are resolved here,
+    # and static sections are laid out once per distinct text
+    def __init__(self, template: Dict = None):
+        tpl = {**DEFAULT_TEMPLATE, **(template or {})}
+        self.page_w, self.page_h = tpl["page_size"]
+        self.margin = tpl["margin"]
+        self.text_width = self.page_w - 2 * self.margin
+        self.bullet_indent = tpl["bullet_indent"]
+        self.styles = {}
+        for key in ("name", "contact", "header", "body"):
+            style = tpl[key]
+            res, _, widths = FONTS[style["font"]]
+            self.styles[key] = {
+                "res": res.encode("ascii"),
+                "size": style["size"],
+                "leading": style["leading"],
+                "space_before": style.get("space_before", 0),
+                "widths": _width_table(widths),
+            }
+        fonts = sorted(FONTS.values())
+        self.font_objects = [
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode("ascii")
+            for _, base, _ in fonts
+        ]
+        self.font_resources = b" ".join(
+            b"/%s %d 0 R" % (res.encode("ascii"), 3 + i) for i, (res, _, _) in enumerate(fonts)
+        )
+        self._static_cache: "OrderedDict[str, List[Line]]" = OrderedDict()
+
+    def _text_width(self, raw: bytes, style: Dict) -> float:
+        widths = style["widths"]
+        return sum(widths[b] for b in raw) * style["size"] / 1000.0
+
+    def _split_word(self, word: bytes, style: Dict, max_w: float) -> List[bytes]:
+        widths = style["widths"]
+        limit = max_w * 1000.0 / style["size"]
+        pieces = []
+        start = 0
+        used = 0
+        for i, b in enumerate(word):
+            if used + widths[b] > limit and i > start:
+                pieces.append(word[start:i])
+                start, used = i, 0
+            used += widths[b]
+        pieces.append(word[start:])
+        return pieces
+
+    def _wrap(self, text: str, style: Dict, x: float, first_leading: float = None) -> List[Line]:
+        max_w = self.text_width - x
+        space_w = self._text_width(b" ", style)
+        lines = []
+        current: List[bytes] = []
+        current_w = 0.0
+        for word in _encode(text).split():
+            w = self._text_width(word, style)
+            if w > max_w:
+                # A single token wider than the line (long URLs) is broken across lines
+                if current:
+                    lines.append(b" ".join(current))
+                pieces = self._split_word(word, style, max_w)
+                lines.extend(pieces[:-1])
+                current = [pieces[-1]]
+                current_w = self._text_width(pieces[-1], style)
+                continue
+            if current and current_w + space_w + w > max_w:
+                lines.append(b" ".join(current))
+                current, current_w = [word], w
+            else:
+                current_w += (space_w if current else 0) + w
+                current.append(word)
+        if current:
+            lines.append(b" ".join(current))
+        out = []
+        for i, raw in enumerate(lines):
+            leading = style["leading"] if i or first_leading is None else first_leading
+            out.append((leading, style["res"], style["size"], x, _escape(raw)))
+        return out
+
+    def _layout_header(self, block: str) -> List[Line]:
+        # First line is the name (may be empty), the rest is contact info
+        lines = block.rstrip("\n").split("\n")
+        out = self._wrap(lines[0], self.styles["name"], 0)
+        for contact in lines[1:]:
+            out.extend(self._wrap(contact, self.styles["contact"], 0))
+        return out
+
+    def _layout_section(self, block: str) -> List[Line]:
+        lines = block.splitlines()
+        header = self.styles["header"]
+        body = self.styles["body"]
+        out = self._wrap(lines[0], header, 0, first_leading=header["leading"] + header["space_before"])
+        for line in lines[1:]:
+            if line.startswith("- "):
+                bullet = (body["leading"], body["res"], body["size"], 0, b"\x95")
+                wrapped = self._wrap(line[2:], body, self.bullet_indent)
+                # The bullet glyph shares the first wrapped line's baseline
+                out.append(bullet)
+                if wrapped:
+                    first = wrapped[0]
+                    out.append((0,) + first[1:])
+                    out.extend(wrapped[1:])
+            else:
+                out.extend(self._wrap(line, body, 0))
+        return out
+
+    def _cached(self, block: str, layout) -> List[Line]:
+        lines = self._static_cache.get(block)
+        if lines is None:
+            lines = layout(block)
+            self._static_cache[block] = lines
+            if len(self._static_cache) > STATIC_CACHE_SIZE:
+                self._static_cache.popitem(last=False)
+        else:
+            self._static_cache.move_to_end(block)
+        return lines
+
+    def layout(self, resume_text: str) -> List[Line]:
+        # resume_text is the output of tailoring.assemble_resume_text: an optional name/contact
+        # block, then sections whose first line is one of SECTION_HEADERS
+        section_titles = set(SECTION_HEADERS.values())
+        blocks = [b for b in resume_text.split("\n\n") if b.strip()]
+        lines = []
+        seen_section = False
+        for raw in blocks:
+            block = raw.strip("\n")
+            title = block.split("\n", 1)[0].strip()
+            if title in section_titles:
+                seen_section = True
+                if title in STATIC_SECTIONS:
+                    lines.extend(self._cached(block, self._layout_section))
+                else:
+                    lines.extend(self._layout_section(block))
+            elif not seen_section:
+                lines.extend(self._cached(raw, self._layout_header))
+            else:
+                lines.extend(self._layout_section(block))
+        return lines
+
+    def _paginate(self, lines: List[Line]) -> List[bytes]:
+        pages = []
+        ops: List[bytes] = []
+        top = self.page_h - self.margin
+        y = top
+        for leading, res, size, x, text in lines:
+            if y - leading < self.margin and ops:
+                pages.append(b"".join(ops))
+                ops = []
+                y = top
+            y -= leading
+            ops.append(b"BT /%s %g Tf %g %g Td (%s) Tj ET\n" % (res, size, self.margin + x, y, text))
+        if ops or not pages:
+            pages.append(b"".join(ops))
+        return pages
+
+    def render(self, resume_text: str, out: BytesIO = None) -> BytesIO:
+        out = out if out is not None else BytesIO()
+        pages = self._paginate(self.layout(resume_text))
+
+        # 1 catalog, 2 pages, 3.. fonts, then a (page, content) pair per page
+        first_page = 3 + len(self.font_objects)
+        page_ids = [first_page + 2 * i for i in range(len(pages))]
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                b" ".join(b"%d 0 R" % pid for pid in page_ids), len(pages)),
+            *self.font_objects,
+        ]
+        for pid, content in zip(page_ids, pages):
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] /Resources << /Font << %s >> >> /Contents %d 0 R >>"
+                % (self.page_w, self.page_h, self.font_resources, pid + 1))
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+
+        start = out.tell()
+        out.write(b"%PDF-1.4\n")
+        offsets = []
+        for i, obj in enumerate(objects, start=1):
+            offsets.append(out.tell() - start)
+            out.write(b"%d 0 obj\n%s\nendobj\n" % (i, obj))
+        xref = out.tell() - start
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        out.write(b"".join(b"%010d 00000 n \n" % off for off in offsets))
+        out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+        return out
+
+
+@lru_cache(maxsize=1)
+def default_template() -> ResumeTemplate:
+    return ResumeTemplate()
+
+
+def render_resume_pdf(resume_text: str, template: Optional[ResumeTemplate] = None) -> bytes:
+    buf = (template or default_template()).render(resume_text)
+    return buf.getvalue()
+
+
+def resume_file_payload(resume_text: str, name: str = "") -> Dict:
+    # Playwright's set_input_files accepts this dict directly; nothing touches disk
+    stem = "_".join((name or "").split()) or "Resume"
+    if not pdf_encodable(resume_text):
+        # No embedded Unicode font, so text WinAnsi can't hold goes up as UTF-8 text, as it did before PDFs
+        return {
+            "name": f"{stem}_Resume.txt",
+            "mimeType": "text/plain",
+            "buffer": resume_text.encode("utf-8"),
+        }
+    return {
+        "name": f"{stem}_Resume.pdf",
+        "mimeType": "application/pdf",
+        "buffer": render_resume_pdf(resume_text),
+    }
@@ -9,7 +9,8 @@ import time
 from playwright.async_api import async_playwright
 
 from apply_runner import apply_to_job
-from job_finder import find_jobs
+from job_finder import find_jobs, rank_jobs
+from sharding import find_jobs_sharded
 
 def read_json(path):
     search = [path]
@@ -50,42 +51,46 @@ async def main():
     parser.add_argument("--max", type=int, default=3, help="Max applications per run")
     parser.add_argument("--delay-min", type=float, default=8.0, help="Min delay seconds between applications")
     parser.add_argument("--delay-max", type=float, default=20.0, help="Max delay seconds between applications")
+    parser.add_argument("--shards", type=int, default=0, help="Run discovery on this many processes (0 = single process)")
     args = parser.parse_args()
 
     applicant = read_json(args.applicant)
     base_resume = read_json(args.resume)
 
-    jobs = await find_jobs(args.sources, max_total=args.max * 3)
+    if args.shards > 0:
+        jobs = await find_jobs_sharded(args.sources, max_total=args.max * 3, base_resume=base_resume, processes=args.shards)
+    else:
+        jobs = await find_jobs(args.sources, max_total=args.max * 3, base_resume=base_resume)
     if not jobs:
         print("No jobs discovered. Adjust sources.json.")
         return
 
-    applied = 0
+    # Candidates arrive ranked by title; re-rank with descriptions before spending browser applications
+    candidates = []
     for job in jobs:
-        if applied >= args.max:
-            break
-
-        url = job["url"]
-        company = job.get("company", "")
-        role = job.get("title", "")
-
-        jd = await extract_job_desc(url)
-        # Optional:ensure role still looks relevant withdescription present
+        jd = await extract_job_desc(job.url)
+        # skip postings that block content scraping without Login
         if not jd:
-            # skip postings that block content scraping without Login
             continue
+        job.description = jd
+        candidates.append(job)
+    candidates = rank_jobs(candidates, base_resume, top_k=args.max)
+
+    for job in candidates:
+        url = job.url
+        company = job.company
+        role = job.title
 
-        print(f"Applying to: {company} — {role} — {url}")
+        print(f"Applying to: {company} — {role} — {url} (score={job.score})")
 
         result = await apply_to_job(
             job_url=url,
             applicant=applicant,
             base_resume=base_resume,
-            job_meta={"company": company, "role": role, "job_desc": jd}
+            job_meta={"company": company, "role": role, "job_desc": job.description}
         )
         print(result)
 
-        applied += 1
         # Randomized delay between applications
         d = random.uniform(args.delay_min, args.delay_max)
         await asyncio.sleep(d)
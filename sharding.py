@@ -0,0 +1,572 @@
+# sharding.py
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from job_finder import (
+    Posting,
+    _apply_filters_from_cfg,
+    dedupe,
+    discover_jobs,
+    print_discovery_stats,
+    select_jobs,
+)
+from tailoring import generate_application_package
+
+# Sharded discovery/tailoring. Shards run either on an in-process pool (find_jobs_sharded) or as
+# tasks in a SQLite task store that any number of `python sharding.py work` processes claim.
+# The store file stays on the coordinator's local disk (SQLite locking is not reliable on
+# NFS/SMB). Workers on that host open it directly; workers on other hosts reach it through
+# `python sharding.py serve` by passing its URL as --store.
+
+def split_sources(cfg: dict, n_shards: int) -> list[dict]:
+    # Round-robin so each shard gets a similar mix of Lever companies and Greenhouse boards
+    lever = cfg.get("lever_companies", []) or []
+    boards = cfg.get("greenhouse_boards", []) or []
+    n = max(1, min(n_shards, len(lever) + len(boards)))
+    shards = []
+    for i in range(n):
+        shards.append({
+            **cfg,
+            "lever_companies": lever[i::n],
+            "greenhouse_boards": boards[i::n],
+        })
+    return [s for s in shards if s["lever_companies"] or s["greenhouse_boards"]]
+
+def merge_results(results: list[tuple[list[Posting], dict]]) -> tuple[list[Posting], dict]:
+    # Same dedupe as a single-process sweep; shard order keeps the merge deterministic
+    all_jobs = []
+    stats = {}
+    for jobs, shard_stats in results:
+        all_jobs.extend(jobs)
+        for k, v in shard_stats.items():
+            if isinstance(v, (int, float)):
+                stats[k] = stats.get(k, 0) + v
+    all_jobs = dedupe(all_jobs)
+    # Postings unpickled from worker processes carry fresh string copies; re-intern as make_posting does
+    for j in all_jobs:
+        j.company = sys.intern(j.company)
+        j.location = sys.intern(j.location)
+        j.source = sys.intern(j.source)
+    stats["total_after_dedupe"] = len(all_jobs)
+    return all_jobs, stats
+
+def discover_shard(shard_cfg: dict, relax_remote: bool = False) -> tuple[list[Posting], dict]:
+    # Process entry point: each shard gets its own event loop and browser
+    return asyncio.run(discover_jobs(shard_cfg, relax_remote=relax_remote))
+
+# Tailoring one job takes well under a millisecond; below this many jobs process startup costs more
+TAILOR_PARALLEL_MIN = 500
+
+def tailor_batch(applicant: Dict, base_resume: Dict, job_metas: List[Dict], processes: int = None) -> List[Dict]:
+    fn = partial(generate_application_package, applicant, base_resume)
+    if processes == 1 or len(job_metas) < TAILOR_PARALLEL_MIN:
+        return [fn(m) for m in job_metas]
+    workers = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, job_metas, chunksize=max(1, len(job_metas) // (workers * 4))))
+
+async def find_jobs_sharded(sources_path: str = "sources.json", max_total: int = 10, base_resume: dict = None,
+                            processes: int = None, shards: int = None) -> list[Posting]:
+    with open(sources_path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    filter_info = _apply_filters_from_cfg(cfg)
+    workers = processes or os.cpu_count() or 1
+    shard_cfgs = split_sources(cfg, shards or workers)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async def _sweep(relax_remote: bool):
+            futures = [loop.run_in_executor(pool, discover_shard, s, relax_remote) for s in shard_cfgs]
+            return merge_results(await asyncio.gather(*futures))
+
+        jobs, stats = await _sweep(False)
+        # Remote fallback is decided on the merged result, as in find_jobs
+        if len(jobs) == 0 and filter_info.get("has_remote_filter"):
+            print("No jobs matched with remote filter; retrying without remote constraint to diagnose…")
+            jobs, stats = await _sweep(True)
+            if stats.get("total_after_dedupe", 0) > 0:
+                print(f"Found {stats['total_after_dedupe']} jobs without remote filter. "
+                      f"Consider broadening filters.remote_keywords in sources.json (currently: {filter_info.get('remote_words')}).")
+
+    print(f"Shards: {len(shard_cfgs)} across {workers} process(es)")
+    print_discovery_stats(stats)
+    return select_jobs(jobs, max_total, base_resume)
+
+
+# --- Task store mode (one coordinator store, worker processes on any number of hosts) ---
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    claimed_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS shard_tasks_status ON shard_tasks (status, id);
+CREATE INDEX IF NOT EXISTS shard_tasks_run ON shard_tasks (run_id, id);
+"""
+
+class ShardStore:
+    # Local-disk only: claims depend on BEGIN IMMEDIATE being atomic, which SQLite's locking
+    # can't guarantee on a network mount. Other hosts go through serve_store/RemoteShardStore.
+    # A claimed task is leased to its worker, which heartbeats while it runs (see work); only an
+    # expired lease lets another worker retake it, and a task that keeps losing its worker
+    # (e.g. it crashes the process) is failed after max_attempts, as in ApplyQueue.
+    def __init__(self, db_path: str = "shards.db", lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=60)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # Stores created before leases existed
+        cols = {r["name"] for r in self._conn.execute("PRAGMA table_info(shard_tasks)")}
+        for col, ddl in (("attempts", "INTEGER NOT NULL DEFAULT 0"), ("lease_until", "REAL")):
+            if col not in cols:
+                self._conn.execute(f"ALTER TABLE shard_tasks ADD COLUMN {col} {ddl}")
+        self._conn.execute(
+            "UPDATE shard_tasks SET lease_until = claimed_at + ? WHERE status = 'running' AND lease_until IS NULL",
+            (lease_seconds,),
+        )
+
+    def add_tasks(self, run_id: str, kind: str, payloads: list[dict]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT INTO shard_tasks (run_id, kind, payload) VALUES (?, ?, ?)",
+                [(run_id, kind, json.dumps(p)) for p in payloads],
+            )
+            self._conn.execute("COMMIT")
+        return len(payloads)
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        # Pending tasks first; running tasks whose lease expired (dead worker) are taken over
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE shard_tasks SET status = 'failed', finished_at = ?, "
+                    "error = 'Abandoned by ' || COALESCE(worker, '?') || ' after ' || attempts || ' attempt(s)' "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT * FROM shard_tasks WHERE status = 'pending' "
+                    "OR (status = 'running' AND lease_until < ?) ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE shard_tasks SET status = 'running', worker = ?, claimed_at = ?, lease_until = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (worker, now, now + self.lease_seconds, row["id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row["id"], "run_id": row["run_id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+
+    def heartbeat(self, task_id: int, worker: str) -> bool:
+        # Extend worker's lease; False means the task was retaken (or abandoned) meanwhile
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE shard_tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, task_id, worker),
+            )
+            return cur.rowcount == 1
+
+    # Results only land while worker still holds the task; False means they were dropped
+    def complete(self, task_id: int, worker: str, result: dict) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE shard_tasks SET status = 'done', result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (json.dumps(result), time.time(), task_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, task_id: int, worker: str, error: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE shard_tasks SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (error, time.time(), task_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def progress(self, run_id: str) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM shard_tasks WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def results(self, run_id: str, kind: str):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM shard_tasks WHERE run_id = ? AND kind = ? AND status = 'done' ORDER BY id",
+                (run_id, kind),
+            ).fetchall()
+        for r in rows:
+            yield json.loads(r["result"])
+
+    def tasks(self, run_id: str, kind: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, status, payload, error FROM shard_tasks WHERE run_id = ? AND kind = ? ORDER BY id",
+                (run_id, kind),
+            ).fetchall()
+        return [{"id": r["id"], "status": r["status"], "payload": json.loads(r["payload"]), "error": r["error"]}
+                for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+# Worker-facing operations that serve_store exposes; plan/merge stay on the coordinator
+STORE_OPS = ("claim", "heartbeat", "complete", "fail")
+
+def serve_store(store: ShardStore, host: str = "127.0.0.1", port: int = 8765,
+                token: str = None) -> ThreadingHTTPServer:
+    # JSON over plain HTTP: meant for a trusted network. Payloads carry applicant data,
+    # so set a token (SHARD_STORE_TOKEN) whenever it listens beyond localhost.
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, data: dict):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if token and not hmac.compare_digest(self.headers.get("X-Shard-Token", ""), token):
+                self._send(403, {"error": "bad token"})
+                return
+            op = self.path.strip("/")
+            if op not in STORE_OPS:
+                self._send(404, {"error": f"unknown operation {op!r}"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                args = json.loads(self.rfile.read(length) or b"{}")
+                result = getattr(store, op)(**args)
+            except (ValueError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(200, {"result": result, "lease_seconds": store.lease_seconds})
+
+        def log_message(self, format, *args):
+            return
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+class RemoteShardStore:
+    # The worker-side half of ShardStore, over HTTP to `sharding.py serve` on the coordinator.
+    # Lease length and attempt cap are the server's; lease_seconds follows its replies.
+    def __init__(self, url: str, token: str = None, timeout: float = 60.0):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.lease_seconds = 300.0
+
+    def _call(self, op: str, **args):
+        req = urllib.request.Request(
+            f"{self.url}/{op}",
+            data=json.dumps(args).encode("utf-8"),
+            headers={"Content-Type": "application/json", "X-Shard-Token": self.token or ""},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            reply = json.load(resp)
+        self.lease_seconds = reply["lease_seconds"]
+        return reply["result"]
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        return self._call("claim", worker=worker)
+
+    def heartbeat(self, task_id: int, worker: str) -> bool:
+        return self._call("heartbeat", task_id=task_id, worker=worker)
+
+    def complete(self, task_id: int, worker: str, result: dict) -> bool:
+        return self._call("complete", task_id=task_id, worker=worker, result=result)
+
+    def fail(self, task_id: int, worker: str, error: str) -> bool:
+        return self._call("fail", task_id=task_id, worker=worker, error=error)
+
+    def close(self) -> None:
+        return
+
+def open_store(store: str, lease_seconds: float = 300.0, max_attempts: int = 3):
+    # --store is either a local SQLite path or the URL of `sharding.py serve`
+    if store.startswith(("http://", "https://")):
+        return RemoteShardStore(store, token=os.environ.get("SHARD_STORE_TOKEN"))
+    return ShardStore(store, lease_seconds=lease_seconds, max_attempts=max_attempts)
+
+def _run_task(task: dict) -> dict:
+    payload = task["payload"]
+    if task["kind"] == "discover":
+        jobs, stats = discover_shard(payload["cfg"], relax_remote=payload.get("relax_remote", False))
+        return {"jobs": [j.to_dict() for j in jobs], "stats": stats}
+    if task["kind"] == "tailor":
+        packages = [generate_application_package(payload["applicant"], payload["base_resume"], m)
+                    for m in payload["job_metas"]]
+        return {"packages": packages, "offset": payload["offset"]}
+    raise ValueError(f"Unknown task kind: {task['kind']}")
+
+def _keep_lease(store, task_id: int, worker: str, stop: threading.Event) -> None:
+    # Tasks are read-only (discovery) or pure (tailoring), so a lost lease only means our result
+    # is dropped by complete(); there is nothing to undo
+    while not stop.wait(store.lease_seconds / 3):
+        try:
+            if not store.heartbeat(task_id, worker):
+                return
+        except (OSError, sqlite3.Error):
+            # Transient (store busy, coordinator unreachable); the next beats still fit in the lease
+            continue
+
+def work(store_path: str, idle_exit: bool = True, poll_seconds: float = 5.0,
+         lease_seconds: float = 300.0, max_attempts: int = 3) -> int:
+    # Claim and run tasks until the store is drained (or forever with idle_exit=False).
+    # store_path may be a serve URL, in which case the lease options are the server's.
+    store = open_store(store_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    done = 0
+    try:
+        while True:
+            task = store.claim(worker)
+            if task is None:
+                if idle_exit:
+                    return done
+                time.sleep(poll_seconds)
+                continue
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=_keep_lease, args=(store, task["id"], worker, stop), daemon=True)
+            heartbeat.start()
+            try:
+                if store.complete(task["id"], worker, _run_task(task)):
+                    done += 1
+                else:
+                    print(f"Task {task['id']} was retaken after its lease expired; result dropped")
+            except Exception as e:
+                store.fail(task["id"], worker, str(e))
+            finally:
+                stop.set()
+                heartbeat.join()
+    finally:
+        store.close()
+
+def plan_discovery(store: ShardStore, cfg: dict, n_shards: int, relax_remote: bool = False, run_id: str = None) -> str:
+    run_id = run_id or uuid.uuid4().hex[:12]
+    payloads = [{"cfg": s, "relax_remote": relax_remote} for s in split_sources(cfg, n_shards)]
+    store.add_tasks(run_id, "discover", payloads)
+    return run_id
+
+def plan_tailoring(store: ShardStore, applicant: Dict, base_resume: Dict, job_metas: List[Dict],
+                   chunk_size: int = 50, run_id: str = None) -> str:
+    run_id = run_id or uuid.uuid4().hex[:12]
+    payloads = [
+        {"applicant": applicant, "base_resume": base_resume, "job_metas": job_metas[i:i + chunk_size], "offset": i}
+        for i in range(0, len(job_metas), chunk_size)
+    ]
+    store.add_tasks(run_id, "tailor", payloads)
+    return run_id
+
+def unfinished_tasks(store: ShardStore, run_id: str, kind: str) -> list[dict]:
+    # Tasks whose results a merge would be missing (failed, or still pending/running)
+    return [t for t in store.tasks(run_id, kind) if t["status"] != "done"]
+
+def merge_discovery(store: ShardStore, run_id: str) -> tuple[list[Posting], dict]:
+    return merge_results(
+        ([Posting.from_dict(d) for d in r["jobs"]], r["stats"]) for r in store.results(run_id, "discover")
+    )
+
+def merge_tailoring(store: ShardStore, run_id: str) -> List[Optional[Dict]]:
+    # Packages are placed at their job's index in the planned list (chunk offset + position);
+    # jobs whose chunk didn't finish stay None so no package ever shifts onto another job
+    total = sum(len(t["payload"]["job_metas"]) for t in store.tasks(run_id, "tailor"))
+    packages: List[Optional[Dict]] = [None] * total
+    for r in store.results(run_id, "tailor"):
+        for i, package in enumerate(r["packages"]):
+            packages[r["offset"] + i] = package
+    return packages
+
+def _describe_task(kind: str, payload: dict) -> str:
+    if kind == "tailor":
+        start = payload["offset"]
+        return f"jobs {start}..{start + len(payload['job_metas']) - 1}"
+    cfg = payload["cfg"]
+    return f"{len(cfg.get('lever_companies', []))} Lever / {len(cfg.get('greenhouse_boards', []))} Greenhouse boards"
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded job discovery and tailoring.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("local", help="Run a sharded discovery sweep on a local process pool")
+    p.add_argument("--sources", default="sources.json")
+    p.add_argument("--resume", default="base_resume.json", help="Rank results against this resume ('' to skip)")
+    p.add_argument("--processes", type=int, default=0, help="Worker processes (0 = CPU count)")
+    p.add_argument("--shards", type=int, default=0, help="Shards (0 = one per process)")
+    p.add_argument("--max", type=int, default=100)
+    p.add_argument("--out", default="jobs.json")
+
+    p = sub.add_parser("tailor", help="Tailor packages for a list of jobs on a local process pool")
+    p.add_argument("--applicant", default="application.json")
+    p.add_argument("--resume", default="base_resume.json")
+    p.add_argument("--jobs", required=True, help="JSON list of {company, role, job_desc}")
+    p.add_argument("--processes", type=int, default=0,
+                   help=f"Worker processes (0 = CPU count; fewer than {TAILOR_PARALLEL_MIN} jobs run serially)")
+    p.add_argument("--out", default="packages.json")
+
+    p = sub.add_parser("plan", help="Queue discovery shards in a local task store")
+    p.add_argument("--store", default="shards.db")
+    p.add_argument("--sources", default="sources.json")
+    p.add_argument("--shards", type=int, default=8)
+    p.add_argument("--relax-remote", action="store_true")
+    p.add_argument("--run-id")
+
+    p = sub.add_parser("plan-tailor", help="Queue tailoring chunks in a local task store")
+    p.add_argument("--store", default="shards.db")
+    p.add_argument("--applicant", default="application.json")
+    p.add_argument("--resume", default="base_resume.json")
+    p.add_argument("--jobs", required=True, help="JSON list of {company, role, job_desc}")
+    p.add_argument("--chunk-size", type=int, default=50)
+    p.add_argument("--run-id")
+
+    p = sub.add_parser("serve", help="Expose a local task store to workers on other hosts")
+    p.add_argument("--store", default="shards.db")
+    p.add_argument("--host", default="127.0.0.1", help="Interface to listen on (0.0.0.0 for other hosts)")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--lease-seconds", type=float, default=300.0, help="Lease renewed by a heartbeat while a task runs")
+    p.add_argument("--max-attempts", type=int, default=3, help="Fail a task after this many workers died on it")
+
+    p = sub.add_parser("work", help="Claim and run tasks from a task store")
+    p.add_argument("--store", default="shards.db",
+                   help="SQLite path on this host, or the http:// URL of `sharding.py serve`")
+    p.add_argument("--processes", type=int, default=1)
+    p.add_argument("--forever", action="store_true", help="Keep polling when the store is empty")
+    p.add_argument("--lease-seconds", type=float, default=300.0,
+                   help="Lease renewed by a heartbeat while a task runs (local store only)")
+    p.add_argument("--max-attempts", type=int, default=3,
+                   help="Fail a task after this many workers died on it (local store only)")
+
+    p = sub.add_parser("merge", help="Merge finished results of a run")
+    p.add_argument("--store", default="shards.db")
+    p.add_argument("--run-id", required=True)
+    p.add_argument("--kind", choices=["discover", "tailor"], default="discover")
+    p.add_argument("--resume", default="base_resume.json", help="Rank discovery results against this resume ('' to skip)")
+    p.add_argument("--sources", default="sources.json", help="Role keywords used to rank titles")
+    p.add_argument("--max", type=int, default=100)
+    p.add_argument("--out", default="jobs.json")
+    p.add_argument("--allow-partial", action="store_true",
+                   help="Merge even if some tasks failed or are unfinished (missing tailor packages are null)")
+
+    args = parser.parse_args()
+
+    if args.cmd == "local":
+        base_resume = _read_json(args.resume) if args.resume else None
+        jobs = asyncio.run(find_jobs_sharded(args.sources, args.max, base_resume,
+                                             processes=args.processes or None, shards=args.shards or None))
+        _write_json(args.out, [j.to_dict() for j in jobs])
+        print(f"Wrote {len(jobs)} jobs to {args.out}")
+    elif args.cmd == "tailor":
+        packages = tailor_batch(_read_json(args.applicant), _read_json(args.resume), _read_json(args.jobs),
+                                processes=args.processes or None)
+        _write_json(args.out, packages)
+        print(f"Wrote {len(packages)} packages to {args.out}")
+    elif args.cmd == "plan":
+        store = ShardStore(args.store)
+        run_id = plan_discovery(store, _read_json(args.sources), args.shards, args.relax_remote, args.run_id)
+        print(f"Run {run_id}: {store.progress(run_id)}")
+        store.close()
+    elif args.cmd == "plan-tailor":
+        store = ShardStore(args.store)
+        run_id = plan_tailoring(store, _read_json(args.applicant), _read_json(args.resume),
+                                _read_json(args.jobs), args.chunk_size, args.run_id)
+        print(f"Run {run_id}: {store.progress(run_id)}")
+        store.close()
+    elif args.cmd == "serve":
+        store = ShardStore(args.store, lease_seconds=args.lease_seconds, max_attempts=args.max_attempts)
+        token = os.environ.get("SHARD_STORE_TOKEN")
+        if not token and args.host not in ("127.0.0.1", "localhost"):
+            print("Warning: listening beyond localhost without SHARD_STORE_TOKEN")
+        server = serve_store(store, args.host, args.port, token)
+        print(f"Serving {args.store} on http://{args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            store.close()
+    elif args.cmd == "work":
+        run = partial(work, idle_exit=not args.forever, lease_seconds=args.lease_seconds,
+                      max_attempts=args.max_attempts)
+        if args.processes > 1:
+            with ProcessPoolExecutor(max_workers=args.processes) as pool:
+                done = sum(pool.map(run, [args.store] * args.processes))
+        else:
+            done = run(args.store)
+        print(f"Completed {done} task(s)")
+    elif args.cmd == "merge":
+        store = ShardStore(args.store)
+        unfinished = unfinished_tasks(store, args.run_id, args.kind)
+        for t in unfinished:
+            print(f"Task {t['id']} ({_describe_task(args.kind, t['payload'])}) is {t['status']}"
+                  + (f": {t['error']}" if t["error"] else ""))
+        if unfinished and not args.allow_partial:
+            store.close()
+            raise SystemExit(f"Run {args.run_id} has {len(unfinished)} unfinished {args.kind} task(s); "
+                             f"re-plan or pass --allow-partial")
+        if args.kind == "discover":
+            jobs, stats = merge_discovery(store, args.run_id)
+            _apply_filters_from_cfg(_read_json(args.sources))
+            print_discovery_stats(stats)
+            jobs = select_jobs(jobs, args.max, _read_json(args.resume) if args.resume else None)
+            _write_json(args.out, [j.to_dict() for j in jobs])
+            print(f"Wrote {len(jobs)} jobs to {args.out}")
+        else:
+            packages = merge_tailoring(store, args.run_id)
+            _write_json(args.out, packages)
+            missing = sum(1 for p in packages if p is None)
+            print(f"Wrote {len(packages)} packages to {args.out}" + (f" ({missing} missing, null)" if missing else ""))
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
-from typing import List
+from typing import Dict, List
+
+def _tokenize(text: str) -> List[str]:
+    return [w.strip(".,:;()[]").lower() for w in text.split()]
 
 def extract_keywords(text: str, limit: int = 15) -> List[str]:
     common = {"and","or","the","with","for","to","in","on","of","a","an"}
-    words = [w.strip(".,:;()[]").lower() for w in text.split()]
+    words = _tokenize(text)
     freq = {}
     for w in words:
         if len(w) > 2 and w not in common:
@@ -18,6 +21,43 @@ def tailor_bullets(base_bullets: List[str], job_desc: str) -> List[str]:
     prioritized.sort(reverse=True, key=lambda x: x[0])
     return [b for _, b in prioritized]
 
+class KeywordModel:
+    # Resume skills compiled once into token sets; scoring a job is one tokenize pass
+    # plus a set lookup per skill instead of repeated substring scans
+    def __init__(self, skills: List[str]):
+        self.terms = []
+        seen = set()
+        for skill in skills:
+            tokens = tuple(t for t in _tokenize(skill) if t)
+            if not tokens or tokens in seen:
+                continue
+            seen.add(tokens)
+            self.terms.append((skill, tokens))
+
+    def _text_tokens(self, text: str) -> set:
+        tokens = set()
+        for t in _tokenize(text):
+            tokens.add(t)
+            # "REST/JSON" should also count as "rest" and "json"
+            if "/" in t:
+                tokens.update(p for p in t.split("/") if p)
+        return tokens
+
+    def matched(self, text: str) -> List[str]:
+        tokens = self._text_tokens(text)
+        return [skill for skill, terms in self.terms if all(t in tokens for t in terms)]
+
+    def score(self, text: str) -> float:
+        return len(self.matched(text)) / max(1, len(self.terms))
+
+def build_keyword_model(base_resume: Dict) -> KeywordModel:
+    return KeywordModel(list(base_resume.get("skills", [])))
+
+def build_title_model(base_resume: Dict, role_words: List[str]) -> KeywordModel:
+    # Titles are matched against the target role phrases (e.g. "qa", "qa engineer") plus the
+    # resume skills; multi-word phrases count separately, so "QA Automation Engineer" outranks "QA Engineer"
+    return KeywordModel(list(role_words) + list(base_resume.get("skills", [])))
+
 def generate_cover_letter(name: str, company: str, role: str, highlights: List[str]) -> str:
     lines = [
         f"Dear Hiring Team at {company},",
@@ -32,7 +72,6 @@ def generate_cover_letter(name: str, company: str, role: str, highlights: List[s
     return "\n".join(lines)
 
 # New functions for per-application tailoring
-from typing import Dict
 
 SECTION_HEADERS = {
     "skills": "Skills",
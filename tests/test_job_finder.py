@@ -0,0 +1,121 @@
+# tests/test_job_finder.py
+import asyncio
+
+import pytest
+
+import job_finder
+from job_finder import _iter_greenhouse_jobs, _iter_json_array, _iter_lever_postings
+
+
+def test_top_level_array_with_whitespace_and_nesting():
+    text = ' [ {"a": [1, [2]]} ,\n{"b": "]"} ] '
+    assert list(_iter_json_array(text)) == [{"a": [1, [2]]}, {"b": "]"}]
+
+
+def test_empty_array():
+    assert list(_iter_json_array("[]")) == []
+
+
+def test_empty_body():
+    assert list(_iter_json_array("")) == []
+
+
+def test_non_array_top_level_yields_nothing():
+    # Lever answers unknown companies with {"ok": false}
+    assert list(_iter_json_array('{"ok": false}')) == []
+
+
+def test_scalar_elements():
+    assert list(_iter_json_array('[null, 1, "x"]')) == [None, 1, "x"]
+
+
+def test_key_after_other_members():
+    board = '{"meta": {"total": 2, "x": [{"jobs": []}]}, "jobs": [{"title": "QA"}, {"title": "SDET"}]}'
+    assert list(_iter_json_array(board, key="jobs")) == [{"title": "QA"}, {"title": "SDET"}]
+
+
+def test_key_first_with_empty_array():
+    assert list(_iter_json_array('{ "jobs" : [ ] , "meta" : {} }', key="jobs")) == []
+
+
+def test_missing_key_yields_nothing():
+    assert list(_iter_json_array('{"meta": {}}', key="jobs")) == []
+
+
+@pytest.mark.parametrize("text", ['[{"a": 1}', '[{"a": 1},', '[{"a": ', "[1 2]", "["])
+def test_truncated_or_malformed_array_raises(text):
+    with pytest.raises(ValueError):
+        list(_iter_json_array(text))
+
+
+@pytest.mark.parametrize("text", [
+    '{"jobs": [{"title": "QA"}',
+    '{"meta": {"total": 1}',
+    '{"jobs": {}}',
+    '{"jobs" [1]}',
+])
+def test_truncated_or_malformed_keyed_array_raises(text):
+    with pytest.raises(ValueError):
+        list(_iter_json_array(text, key="jobs"))
+
+
+def test_lever_skips_non_object_entries():
+    body = '[1, null, {"text": "QA", "categories": "x"}]'
+    assert list(_iter_lever_postings(body, "acme")) == [("QA", "", "", "acme")]
+
+
+def test_lever_fields():
+    body = '[{"text": "SDET", "hostedUrl": "https://x/1", "categories": {"location": "Remote", "team": "Eng"}}]'
+    assert list(_iter_lever_postings(body, "acme")) == [("SDET", "Remote", "https://x/1", "Eng")]
+
+
+def test_greenhouse_skips_non_object_entries_and_locations():
+    body = '{"jobs": [[], {"title": "QA", "location": "Remote"}]}'
+    assert list(_iter_greenhouse_jobs(body)) == [("QA", "", "")]
+
+
+def test_greenhouse_fields():
+    body = '{"jobs": [{"title": " QA ", "location": {"name": "Remote"}, "absolute_url": "https://x/2"}]}'
+    assert list(_iter_greenhouse_jobs(body)) == [("QA", "Remote", "https://x/2")]
+
+
+class _Response:
+    def __init__(self, body):
+        self.ok = True
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+
+class _Page:
+    # Just enough of playwright's Page for the API discovery functions
+    def __init__(self, bodies):
+        self.request = self
+        self._bodies = bodies
+
+    async def get(self, url, timeout=None):
+        return _Response(self._bodies[url])
+
+
+def test_discover_lever_filters_and_skips_malformed_boards():
+    job_finder._apply_filters_from_cfg({"filters": {"include_keywords": ["qa"], "remote_keywords": ["remote"]}})
+    good = ('[{"text": "QA Engineer", "hostedUrl": "https://x/1", "categories": {"location": "Remote"}},'
+            ' {"text": "Sales", "hostedUrl": "https://x/2", "categories": {"location": "Remote"}}]')
+    page = _Page({
+        f"{job_finder.LEVER_API_BASE}/v0/postings/good?mode=json": good,
+        f"{job_finder.LEVER_API_BASE}/v0/postings/bad?mode=json": good[:-1],
+    })
+    jobs, stats = asyncio.run(job_finder.discover_lever(page, ["good", "bad"]))
+    assert [j.url for j in jobs] == ["https://x/1"]
+    assert stats == {"lever_raw": 2, "lever_kept": 1}
+
+
+def test_discover_greenhouse_api_filters():
+    job_finder._apply_filters_from_cfg({"filters": {"include_keywords": ["sdet"]}})
+    body = ('{"jobs": [{"title": "SDET", "location": {"name": "Remote"}, "absolute_url": "https://x/3"},'
+            ' {"title": "Designer", "location": {"name": "Remote"}, "absolute_url": "https://x/4"}]}')
+    page = _Page({f"{job_finder.GREENHOUSE_API_BASE}/v1/boards/acme/jobs": body})
+    jobs, stats = asyncio.run(job_finder.discover_greenhouse_api(page, ["https://boards.greenhouse.io/acme"]))
+    assert [(j.title, j.company, j.source) for j in jobs] == [("SDET", "acme", "greenhouse_api")]
+    assert stats == {"gh_api_raw": 2, "gh_api_kept": 1}